@@ -5,30 +5,89 @@ Monitors CPU, memory, and disk usage and sends webhook alerts when thresholds ar
 """
 
 import os
+import sys
 import json
+import logging
 import time
+import signal
 import socket
+import threading
 import psutil
 import requests
 import argparse
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from datetime import datetime
 from pathlib import Path
 
+try:
+    # Faster JSON for the state file when available
+    import orjson
+    
+    def _dumps(obj):
+        return orjson.dumps(obj)
+    
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode()
+    
+    _loads = json.loads
+
+logger = logging.getLogger(__name__)
+
 class SystemMonitor:
     def __init__(self, config_file="/etc/lincheck_monitoring/monitor_config.json"):
         self.config_file = config_file
         self.state_file = "/var/lib/lincheck_monitoring/system_monitor_state.json"
         self.log_file = "/var/log/system-monitor.log"
         self.config = self.load_config()
+        self._apply_config()
         self.state = self.load_state()
+        self._last_saved_blob = None
+        self._prune_disk_timers()
+        
+        # When each alert key may fire again; lives in (and is saved with) the state
+        self._next_alert_allowed = self.state["next_alert_allowed"]
+        
+        # EC2 metadata never changes for the lifetime of the process; a failed
+        # lookup is only remembered for an hour, see get_ec2_metadata()
+        self._ec2_info_cache = None
+        self._ec2_negative_until = 0.0
+        
+        # Hostname/IP rarely change, so only re-resolve them once an hour
+        self._host_ip_cache = None
+        self._host_ip_ts = 0.0
+        
+        # Arm psutil's CPU counter; each later cpu_percent(interval=None) call
+        # reports the average since the previous one, i.e. the whole check interval
+        psutil.cpu_percent(interval=None)
+        self._cpu_primed_ts = time.monotonic()
+        self._cpu_sampled = False
+        
+        # Usage readings for the current check cycle, see _sample_snapshot()
+        self._snapshot = None
+        
+        # Disk usage changes slowly, so partitions are re-read at most every 30 seconds
+        self._disk_cache = {}
+        
+        # Parts of webhook payloads that only depend on host info, see _get_payload_base()
+        self._payload_base = None
+        self._payload_base_key = None
+        
+        # Reuse HTTP connections for the metadata service and webhook posts
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=2, pool_maxsize=4))
+        self.session.headers.update({"Content-Type": "application/json"})
         
         # Ensure directories exist
         os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
         os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
         
-    def load_config(self):
-        """Load configuration from JSON file"""
-        default_config = {
+    @staticmethod
+    def _default_config():
+        """Default configuration values"""
+        return {
             "webhook_url": "",
             "cpu_threshold": 90,
             "memory_threshold": 90,
@@ -37,49 +96,112 @@ class SystemMonitor:
             "check_interval_seconds": 60,
             "disk_partitions": ["/"]  # Monitor root partition by default
         }
+    
+    def _read_config(self):
+        """Read the config file merged with defaults; raises if it is missing or invalid"""
+        with open(self.config_file, 'r') as f:
+            config = json.load(f)
+        # Merge with defaults
+        for key, value in self._default_config().items():
+            if key not in config:
+                config[key] = value
+        return config
+    
+    def load_config(self):
+        """Load configuration from JSON file"""
+        default_config = self._default_config()
         
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
-                    # Merge with defaults
-                    for key, value in default_config.items():
-                        if key not in config:
-                            config[key] = value
-                    return config
-            except Exception as e:
-                print(f"Error loading config: {e}")
-                return default_config
-        else:
-            # Create default config file
-            with open(self.config_file, 'w') as f:
-                json.dump(default_config, f, indent=2)
-            print(f"Created default config file: {self.config_file}")
-            print("Please edit the config file and set your webhook_url before running.")
+        try:
+            return self._read_config()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error loading config: {e}")
             return default_config
+        
+        # Create default config file
+        with open(self.config_file, 'w') as f:
+            json.dump(default_config, f, indent=2)
+        print(f"Created default config file: {self.config_file}")
+        print("Please edit the config file and set your webhook_url before running.")
+        return default_config
+    
+    def _apply_config(self):
+        """Precompute values derived from the config that check_thresholds uses every cycle"""
+        self._disk_partitions = tuple(self.config["disk_partitions"])
+        self._disk_alert_keys = {partition: self._disk_alert_key(partition) for partition in self._disk_partitions}
+        self._sustained_threshold_seconds = self.config["sustained_threshold_minutes"] * 60
+        self._cpu_thresh = self.config["cpu_threshold"]
+        self._mem_thresh = self.config["memory_threshold"]
+        self._disk_thresh = self.config["disk_threshold"]
+    
+    def _prune_disk_timers(self):
+        """Drop high-usage timers for partitions that are no longer monitored"""
+        disk_high_since = self.state["disk_high_since"]
+        for partition in [p for p in disk_high_since if p not in self._disk_alert_keys]:
+            del disk_high_since[partition]
+    
+    @staticmethod
+    def _disk_alert_key(partition):
+        """Alert key for a disk partition, e.g. "disk__root" for "/" (format kept compatible with saved state)"""
+        return "disk_" + partition.replace("/", "_root" if partition == "/" else "")
+    
+    def _alert_key(self, alert_type, partition=None):
+        """Key used for alert cooldowns and recovery tracking"""
+        if not partition:
+            return alert_type
+        alert_key = self._disk_alert_keys.get(partition)
+        return alert_key if alert_key is not None else self._disk_alert_key(partition)
     
     def load_state(self):
         """Load previous state from file"""
-        if os.path.exists(self.state_file):
-            try:
-                with open(self.state_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading state: {e}")
+        try:
+            with open(self.state_file, 'rb') as f:
+                return self._migrate_state(_loads(f.read()))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error loading state: {e}")
         
         return {
             "cpu_high_since": None,
             "memory_high_since": None,
             "disk_high_since": {},
             "last_alert_sent": {},
+            "next_alert_allowed": {},
             "last_recovery_sent": {}
         }
     
+    @staticmethod
+    def _migrate_state(state):
+        """Convert ISO timestamps written by older versions to epoch seconds"""
+        def to_epoch(value):
+            if isinstance(value, str):
+                return datetime.fromisoformat(value).timestamp()
+            return value
+        
+        state["cpu_high_since"] = to_epoch(state.get("cpu_high_since"))
+        state["memory_high_since"] = to_epoch(state.get("memory_high_since"))
+        for key in ("disk_high_since", "last_alert_sent", "last_recovery_sent"):
+            state[key] = {name: to_epoch(value) for name, value in state.get(key, {}).items()}
+        if "next_alert_allowed" not in state:
+            state["next_alert_allowed"] = {
+                key: sent_at + 3 * 3600 for key, sent_at in state["last_alert_sent"].items()
+            }
+        return state
+    
     def save_state(self):
-        """Save current state to file"""
+        """Save current state to file (atomically, and only when it changed)"""
         try:
-            with open(self.state_file, 'w') as f:
-                json.dump(self.state, f, indent=2)
+            new_blob = _dumps(self.state)
+            if new_blob == self._last_saved_blob:
+                return
+            
+            # Write to a temp file and rename so a crash never leaves a truncated state file
+            tmp_file = f"{self.state_file}.tmp"
+            Path(tmp_file).write_bytes(new_blob)
+            os.replace(tmp_file, self.state_file)
+            self._last_saved_blob = new_blob
         except Exception as e:
             print(f"Error saving state: {e}")
     
@@ -160,7 +282,10 @@ class SystemMonitor:
             print(f"Error during log cleanup: {e}")
     
     def get_ec2_metadata(self):
-        """Get EC2 instance metadata if running on AWS"""
+        """Get EC2 instance metadata if running on AWS (cached after first lookup)"""
+        if self._ec2_info_cache is not None:
+            return self._ec2_info_cache
+        
         ec2_info = {
             "instance_id": None,
             "instance_name": None,
@@ -169,13 +294,16 @@ class SystemMonitor:
             "region": None
         }
         
+        if time.monotonic() < self._ec2_negative_until:
+            return ec2_info
+        
         try:
             # EC2 metadata endpoint
             metadata_url = "http://169.254.169.254/latest/meta-data"
             headers = {"X-aws-ec2-metadata-token-ttl-seconds": "21600"}
             
             # Get token for IMDSv2
-            token_response = requests.put(
+            token_response = self.session.put(
                 f"{metadata_url}/../api/token",
                 headers=headers,
                 timeout=2
@@ -188,36 +316,32 @@ class SystemMonitor:
                 # Fallback to IMDSv1
                 auth_headers = {}
             
-            # Get instance ID
-            try:
-                response = requests.get(f"{metadata_url}/instance-id", headers=auth_headers, timeout=2)
-                if response.status_code == 200:
-                    ec2_info["instance_id"] = response.text
-            except:
-                pass
+            def fetch(path):
+                try:
+                    response = self.session.get(f"{metadata_url}/{path}", headers=auth_headers, timeout=2)
+                    if response.status_code == 200:
+                        return response.text
+                except:
+                    pass
+                return None
             
-            # Get instance type
-            try:
-                response = requests.get(f"{metadata_url}/instance-type", headers=auth_headers, timeout=2)
-                if response.status_code == 200:
-                    ec2_info["instance_type"] = response.text
-            except:
-                pass
+            # Get instance ID, instance type and availability zone in parallel
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                instance_id, instance_type, az = executor.map(
+                    fetch, ["instance-id", "instance-type", "placement/availability-zone"]
+                )
             
-            # Get availability zone
-            try:
-                response = requests.get(f"{metadata_url}/placement/availability-zone", headers=auth_headers, timeout=2)
-                if response.status_code == 200:
-                    az = response.text
-                    ec2_info["availability_zone"] = az
-                    ec2_info["region"] = az[:-1]  # Remove last character to get region
-            except:
-                pass
+            ec2_info["instance_id"] = instance_id
+            ec2_info["instance_type"] = instance_type
+            if az:
+                ec2_info["availability_zone"] = az
+                ec2_info["region"] = az[:-1]  # Remove last character to get region
             
             # Get instance name from tags (requires EC2 describe-tags permission)
             if ec2_info["instance_id"]:
                 try:
-                    # Try to get instance name from EC2 API
+                    # Try to get instance name from EC2 API; boto3 is slow to import,
+                    # so it is only loaded here, once we know we're on EC2
                     import boto3
                     ec2 = boto3.client('ec2', region_name=ec2_info["region"])
                     response = ec2.describe_tags(
@@ -232,14 +356,24 @@ class SystemMonitor:
                     # If boto3 not available or no permissions, try alternative methods
                     pass
                 
+                self._ec2_info_cache = ec2_info
+                
         except Exception as e:
             # Not running on EC2 or metadata service unavailable
             pass
         
+        if self._ec2_info_cache is None:
+            # No instance ID - don't pay the metadata requests again on every check,
+            # but retry in an hour in case this was only a transient failure
+            self._ec2_negative_until = time.monotonic() + 3600
+        
         return ec2_info
     
-    def get_system_info(self):
-        """Get hostname, IP address, and EC2 info if available"""
+    def _get_hostname_ip(self):
+        """Get hostname and primary IP address, refreshed at most once an hour"""
+        if self._host_ip_cache is not None and time.monotonic() - self._host_ip_ts <= 3600:
+            return self._host_ip_cache
+        
         hostname = socket.gethostname()
         try:
             # Get primary IP address
@@ -250,53 +384,154 @@ class SystemMonitor:
         except Exception:
             ip_address = "unknown"
         
+        self._host_ip_cache = (hostname, ip_address)
+        self._host_ip_ts = time.monotonic()
+        return self._host_ip_cache
+    
+    def get_system_info(self):
+        """Get hostname, IP address, and EC2 info if available"""
+        hostname, ip_address = self._get_hostname_ip()
+        
         # Get EC2 metadata if available
         ec2_info = self.get_ec2_metadata()
         
         return hostname, ip_address, ec2_info
     
+    def _read_cpu_usage(self):
+        """Sample average CPU usage percentage since the previous sample
+        
+        Called once per check cycle (see _sample_snapshot), so the value covers the
+        full check interval rather than a short snapshot. The first reading covers
+        the time since process start, padded to at least one second.
+        """
+        if not self._cpu_sampled:
+            elapsed = time.monotonic() - self._cpu_primed_ts
+            if elapsed < 1:
+                time.sleep(1 - elapsed)
+            self._cpu_sampled = True
+        
+        return psutil.cpu_percent(interval=None)
+    
+    @staticmethod
+    def _disk_percent(partition):
+        """Disk usage percentage from a single statvfs call (same formula as psutil.disk_usage)"""
+        st = os.statvfs(partition)
+        total = st.f_blocks * st.f_frsize
+        used = total - st.f_bfree * st.f_frsize
+        # Space reserved for root doesn't count as available to users
+        total_user = used + st.f_bavail * st.f_frsize
+        if not total_user:
+            return 0.0
+        return round(used / total_user * 100, 1)
+    
+    def _read_disk_usage(self, partition):
+        """Sample disk usage percentage for specified partition (cached for 30 seconds)"""
+        now = time.monotonic()
+        cached = self._disk_cache.get(partition)
+        if cached is not None and now - cached[0] < 30:
+            return cached[1]
+        
+        try:
+            percent = self._disk_percent(partition)
+            self._disk_cache[partition] = (now, percent)
+            return percent
+        except Exception as e:
+            print(f"Error getting disk usage for {partition}: {e}")
+            return 0
+    
+    def _sample_snapshot(self):
+        """Take one CPU/memory/disk reading shared by everything in this check cycle"""
+        self._snapshot = {
+            "cpu": self._read_cpu_usage(),
+            "memory": psutil.virtual_memory().percent,
+            "disk": {partition: self._read_disk_usage(partition) for partition in self._disk_partitions}
+        }
+        return self._snapshot
+    
     def get_cpu_usage(self):
         """Get current CPU usage percentage"""
-        return psutil.cpu_percent(interval=1)
+        if self._snapshot is None:
+            self._sample_snapshot()
+        return self._snapshot["cpu"]
     
     def get_memory_usage(self):
         """Get current memory usage percentage"""
-        memory = psutil.virtual_memory()
-        return memory.percent
+        if self._snapshot is None:
+            self._sample_snapshot()
+        return self._snapshot["memory"]
     
     def get_disk_usage(self, partition="/"):
         """Get disk usage percentage for specified partition"""
-        try:
-            disk = psutil.disk_usage(partition)
-            return disk.percent
-        except Exception as e:
-            print(f"Error getting disk usage for {partition}: {e}")
-            return 0
+        if self._snapshot is None:
+            self._sample_snapshot()
+        if partition not in self._snapshot["disk"]:
+            return self._read_disk_usage(partition)
+        return self._snapshot["disk"][partition]
     
-    def send_webhook_alert(self, alert_type, current_value, hostname, ip_address, ec2_info, partition=None):
-        """Send webhook notification"""
-        if not self.config["webhook_url"]:
-            print("Webhook URL not configured. Skipping alert.")
-            return False
+    def _get_payload_base(self, hostname, ip_address, ec2_info):
+        """Get the host-specific parts of webhook payloads, rebuilt only when host info changes"""
+        key = (hostname, ip_address, tuple(ec2_info.values()))
+        if key == self._payload_base_key:
+            return self._payload_base
         
-        timestamp = datetime.now().isoformat()
-        
-        # Build server identification string
+        # Build server identification strings
         server_id = hostname
+        server_name = hostname
         if ec2_info["instance_name"]:
             server_id = f"{ec2_info['instance_name']} ({hostname})"
+            server_name = ec2_info["instance_name"]
         elif ec2_info["instance_id"]:
             server_id = f"{hostname} ({ec2_info['instance_id']})"
+            server_name = server_id
+        
+        ip_field = {
+            "title": "IP Address",
+            "value": ip_address,
+            "short": True
+        }
+        
+        # Add EC2 info if available
+        ec2_fields = []
+        if ec2_info.get("instance_type"):
+            ec2_fields.append({
+                "title": "Instance Type",
+                "value": ec2_info["instance_type"],
+                "short": True
+            })
+        
+        if ec2_info.get("availability_zone"):
+            ec2_fields.append({
+                "title": "Availability Zone",
+                "value": ec2_info["availability_zone"],
+                "short": True
+            })
+        
+        self._payload_base = {
+            "server_id": server_id,
+            "server_name": server_name,
+            "server_fields": [{"title": "Server", "value": server_id, "short": True}, ip_field],
+            "test_fields": [{"title": "Server", "value": server_name, "short": True}, ip_field],
+            "ec2_fields": ec2_fields,
+            "metadata": {
+                "hostname": hostname,
+                "ip_address": ip_address,
+                "ec2_info": ec2_info
+            }
+        }
+        self._payload_base_key = key
+        return self._payload_base
+    
+    def _build_alert_payload(self, alert_type, current_value, hostname, ip_address, ec2_info, timestamp, partition=None):
+        """Build alert message and webhook payload, returns (message, alert_key, payload)"""
+        base = self._get_payload_base(hostname, ip_address, ec2_info)
+        server_id = base["server_id"]
         
         if partition:
             message = f"🚨 DISK ALERT on {server_id}: {partition} usage is {current_value:.1f}% (threshold: {self.config['disk_threshold']}%)"
-            # Use same key format as check_thresholds function
-            partition_key = partition.replace("/", "_root" if partition == "/" else "")
-            alert_key = f"disk_{partition_key}"
         else:
             threshold = self.config[f"{alert_type}_threshold"]
             message = f"🚨 {alert_type.upper()} ALERT on {server_id}: {alert_type} usage is {current_value:.1f}% (threshold: {threshold}%)"
-            alert_key = alert_type
+        alert_key = self._alert_key(alert_type, partition)
         
         # Use Slack-compatible format (same as working test message)
         payload = {
@@ -307,16 +542,7 @@ class SystemMonitor:
                 {
                     "color": "danger",
                     "fields": [
-                        {
-                            "title": "Server",
-                            "value": server_id,
-                            "short": True
-                        },
-                        {
-                            "title": "IP Address",
-                            "value": ip_address,
-                            "short": True
-                        },
+                        *base["server_fields"],
                         {
                             "title": "Alert Type",
                             "value": alert_type.upper(),
@@ -342,43 +568,41 @@ class SystemMonitor:
             ],
             # Keep original data for compatibility
             "metadata": {
+                **base["metadata"],
                 "timestamp": timestamp,
-                "hostname": hostname,
-                "ip_address": ip_address,
                 "alert_type": alert_type,
                 "current_value": current_value,
                 "threshold": self.config[f"{alert_type}_threshold"] if not partition else self.config["disk_threshold"],
-                "partition": partition,
-                "ec2_info": ec2_info
+                "partition": partition
             }
         }
         
         # Add EC2 info if available
-        if ec2_info.get("instance_type"):
-            payload["attachments"][0]["fields"].append({
-                "title": "Instance Type",
-                "value": ec2_info["instance_type"],
-                "short": True
-            })
+        payload["attachments"][0]["fields"].extend(base["ec2_fields"])
         
-        if ec2_info.get("availability_zone"):
-            payload["attachments"][0]["fields"].append({
-                "title": "Availability Zone",
-                "value": ec2_info["availability_zone"], 
-                "short": True
-            })
+        return message, alert_key, payload
+    
+    def send_webhook_alert(self, alert_type, current_value, hostname, ip_address, ec2_info, partition=None, sent_at=None):
+        """Send webhook notification"""
+        if not self.config["webhook_url"]:
+            print("Webhook URL not configured. Skipping alert.")
+            return False
+        
+        if sent_at is None:
+            sent_at = time.time()
+        timestamp = datetime.fromtimestamp(sent_at).isoformat()
+        message, alert_key, payload = self._build_alert_payload(alert_type, current_value, hostname, ip_address, ec2_info, timestamp, partition)
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.config["webhook_url"],
                 json=payload,
-                timeout=10,
-                headers={"Content-Type": "application/json"}
+                timeout=10
             )
             
             if response.status_code == 200:
                 print(f"Alert sent successfully: {message}")
-                self.state["last_alert_sent"][alert_key] = timestamp
+                self._record_alert_sent(alert_key, sent_at)
                 return True
             else:
                 print(f"Failed to send alert. HTTP {response.status_code}: {response.text}")
@@ -388,30 +612,89 @@ class SystemMonitor:
             print(f"Error sending webhook: {e}")
             return False
     
-    def send_recovery_alert(self, alert_type, current_value, hostname, ip_address, ec2_info, partition=None):
+    def send_webhook_batch(self, pending_alerts, hostname, ip_address, ec2_info, sent_at=None):
+        """Send all alerts triggered in one check cycle as a single webhook notification"""
+        if not pending_alerts:
+            return False
+        
+        if len(pending_alerts) == 1:
+            alert = pending_alerts[0]
+            return self.send_webhook_alert(alert["alert_type"], alert["current_value"], hostname, ip_address, ec2_info, alert.get("partition"), sent_at)
+        
+        if not self.config["webhook_url"]:
+            print("Webhook URL not configured. Skipping alerts.")
+            return False
+        
+        if sent_at is None:
+            sent_at = time.time()
+        timestamp = datetime.fromtimestamp(sent_at).isoformat()
+        messages = []
+        alert_keys = []
+        attachments = []
+        alerts = []
+        
+        for alert in pending_alerts:
+            message, alert_key, alert_payload = self._build_alert_payload(
+                alert["alert_type"], alert["current_value"], hostname, ip_address, ec2_info, timestamp, alert.get("partition")
+            )
+            messages.append(message)
+            alert_keys.append(alert_key)
+            attachments.extend(alert_payload["attachments"])
+            alerts.append(alert_payload["metadata"])
+        
+        # Slack-compatible combined message, plus the raw alerts for other consumers.
+        # "metadata" keeps the single-alert shape (first alert) for compatibility.
+        payload = {
+            "text": "\n".join(messages),
+            "username": "System Monitor",
+            "icon_emoji": ":warning:",
+            "attachments": attachments,
+            "metadata": alerts[0],
+            "alerts": alerts,
+            "hostname": hostname,
+            "timestamp": timestamp
+        }
+        
+        try:
+            response = self.session.post(
+                self.config["webhook_url"],
+                json=payload,
+                timeout=10
+            )
+            
+            if response.status_code == 200:
+                for message in messages:
+                    print(f"Alert sent successfully: {message}")
+                for alert_key in alert_keys:
+                    self._record_alert_sent(alert_key, sent_at)
+                return True
+            else:
+                print(f"Failed to send alerts. HTTP {response.status_code}: {response.text}")
+                return False
+                
+        except Exception as e:
+            print(f"Error sending webhook: {e}")
+            return False
+    
+    def send_recovery_alert(self, alert_type, current_value, hostname, ip_address, ec2_info, partition=None, sent_at=None):
         """Send recovery notification when issue is resolved"""
         if not self.config["webhook_url"]:
             print("Webhook URL not configured. Skipping recovery alert.")
             return False
         
-        timestamp = datetime.now().isoformat()
+        if sent_at is None:
+            sent_at = time.time()
+        timestamp = datetime.fromtimestamp(sent_at).isoformat()
         
-        # Build server identification
-        server_id = hostname
-        if ec2_info["instance_name"]:
-            server_id = f"{ec2_info['instance_name']} ({hostname})"
-        elif ec2_info["instance_id"]:
-            server_id = f"{hostname} ({ec2_info['instance_id']})"
+        base = self._get_payload_base(hostname, ip_address, ec2_info)
+        server_id = base["server_id"]
         
         if partition:
             message = f"✅ DISK RECOVERED on {server_id}: {partition} usage is now {current_value:.1f}% (threshold: {self.config['disk_threshold']}%)"
-            # Use same key format as alerts
-            partition_key = partition.replace("/", "_root" if partition == "/" else "")
-            alert_key = f"disk_{partition_key}"
         else:
             threshold = self.config[f"{alert_type}_threshold"]
             message = f"✅ {alert_type.upper()} RECOVERED on {server_id}: {alert_type} usage is now {current_value:.1f}% (threshold: {threshold}%)"
-            alert_key = alert_type
+        alert_key = self._alert_key(alert_type, partition)
         
         # Use Slack-compatible format with green color for recovery
         payload = {
@@ -422,16 +705,7 @@ class SystemMonitor:
                 {
                     "color": "good",
                     "fields": [
-                        {
-                            "title": "Server",
-                            "value": server_id,
-                            "short": True
-                        },
-                        {
-                            "title": "IP Address",
-                            "value": ip_address,
-                            "short": True
-                        },
+                        *base["server_fields"],
                         {
                             "title": "Alert Type",
                             "value": f"{alert_type.upper()} RECOVERED",
@@ -458,31 +732,18 @@ class SystemMonitor:
         }
         
         # Add EC2 info if available
-        if ec2_info.get("instance_type"):
-            payload["attachments"][0]["fields"].append({
-                "title": "Instance Type",
-                "value": ec2_info["instance_type"],
-                "short": True
-            })
-        
-        if ec2_info.get("availability_zone"):
-            payload["attachments"][0]["fields"].append({
-                "title": "Availability Zone",
-                "value": ec2_info["availability_zone"], 
-                "short": True
-            })
+        payload["attachments"][0]["fields"].extend(base["ec2_fields"])
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.config["webhook_url"],
                 json=payload,
-                timeout=10,
-                headers={"Content-Type": "application/json"}
+                timeout=10
             )
             
             if response.status_code == 200:
                 print(f"Recovery alert sent successfully: {message}")
-                self.state["last_recovery_sent"][alert_key] = timestamp
+                self.state["last_recovery_sent"][alert_key] = sent_at
                 return True
             else:
                 print(f"Failed to send recovery alert. HTTP {response.status_code}: {response.text}")
@@ -502,8 +763,7 @@ class SystemMonitor:
         # Don't send recovery if we already sent one recently (1 hour cooldown)
         last_recovery = self.state["last_recovery_sent"].get(alert_key)
         if last_recovery:
-            last_recovery_time = datetime.fromisoformat(last_recovery)
-            if current_time - last_recovery_time < timedelta(hours=1):
+            if current_time - last_recovery < 3600:
                 return False
         
         return True
@@ -519,12 +779,8 @@ class SystemMonitor:
         memory_usage = self.get_memory_usage()
         disk_usage = self.get_disk_usage("/")
         
-        # Build server identification
-        server_name = hostname
-        if ec2_info["instance_name"]:
-            server_name = ec2_info["instance_name"]
-        elif ec2_info["instance_id"]:
-            server_name = f"{hostname} ({ec2_info['instance_id']})"
+        base = self._get_payload_base(hostname, ip_address, ec2_info)
+        server_name = base["server_name"]
         
         # Create friendly test message
         message = f"✅ Server '{server_name}' added to monitoring\n"
@@ -539,16 +795,7 @@ class SystemMonitor:
                 {
                     "color": "good",
                     "fields": [
-                        {
-                            "title": "Server",
-                            "value": server_name,
-                            "short": True
-                        },
-                        {
-                            "title": "IP Address", 
-                            "value": ip_address,
-                            "short": True
-                        },
+                        *base["test_fields"],
                         {
                             "title": "CPU Usage",
                             "value": f"{cpu_usage:.1f}%",
@@ -570,26 +817,13 @@ class SystemMonitor:
         }
         
         # Add EC2 info if available
-        if ec2_info["instance_type"]:
-            payload["attachments"][0]["fields"].append({
-                "title": "Instance Type",
-                "value": ec2_info["instance_type"],
-                "short": True
-            })
-        
-        if ec2_info["availability_zone"]:
-            payload["attachments"][0]["fields"].append({
-                "title": "Availability Zone", 
-                "value": ec2_info["availability_zone"],
-                "short": True
-            })
+        payload["attachments"][0]["fields"].extend(base["ec2_fields"])
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.config["webhook_url"],
                 json=payload,
-                timeout=10,
-                headers={"Content-Type": "application/json"}
+                timeout=10
             )
             
             if response.status_code == 200:
@@ -605,108 +839,139 @@ class SystemMonitor:
     
     def should_send_alert(self, alert_key, current_time):
         """Check if enough time has passed since last alert to avoid spam"""
-        last_alert = self.state["last_alert_sent"].get(alert_key)
-        if not last_alert:
-            return True
-        
-        last_alert_time = datetime.fromisoformat(last_alert)
+        return current_time >= self._next_alert_allowed.get(alert_key, 0.0)
+    
+    def _record_alert_sent(self, alert_key, sent_at):
+        """Remember a sent alert and start its cooldown"""
+        self.state["last_alert_sent"][alert_key] = sent_at
         # Send alert again after 3 hours to avoid spam but ensure we don't miss ongoing issues
-        return current_time - last_alert_time > timedelta(hours=3)
+        self._next_alert_allowed[alert_key] = sent_at + 3 * 3600
     
-    def check_thresholds(self):
+    def check_thresholds(self, current_time=None):
         """Check if thresholds are exceeded for the required duration"""
-        current_time = datetime.now()
+        cpu_thresh = self._cpu_thresh
+        mem_thresh = self._mem_thresh
+        disk_thresh = self._disk_thresh
+        alert_seconds = self._sustained_threshold_seconds
+        disk_alert_keys = self._disk_alert_keys
+        
+        cpu_usage = self.get_cpu_usage()
+        memory_usage = self.get_memory_usage()
+        
+        # Fast path: everything is below threshold and no timers are running,
+        # so there is nothing to start, alert on, recover from or save
+        if (cpu_usage < cpu_thresh
+                and memory_usage < mem_thresh
+                and not self.state["cpu_high_since"]
+                and not self.state["memory_high_since"]
+                and not any(partition in self.state["disk_high_since"] for partition in self._disk_partitions)
+                and all(self.get_disk_usage(partition) < disk_thresh
+                        for partition in self._disk_partitions)):
+            return
+        
+        if current_time is None:
+            current_time = time.time()
         hostname, ip_address, ec2_info = self.get_system_info()
-        alert_duration = timedelta(minutes=self.config["sustained_threshold_minutes"])
+        
+        # Alerts that fire this cycle are collected and sent in one webhook call
+        pending_alerts = []
         
         # Check CPU
-        cpu_usage = self.get_cpu_usage()
-        if cpu_usage >= self.config["cpu_threshold"]:
+        if cpu_usage >= cpu_thresh:
             if not self.state["cpu_high_since"]:
-                self.state["cpu_high_since"] = current_time.isoformat()
+                self.state["cpu_high_since"] = current_time
                 print(f"CPU usage high: {cpu_usage:.1f}% - starting timer")
             else:
-                high_since = datetime.fromisoformat(self.state["cpu_high_since"])
-                if current_time - high_since >= alert_duration:
+                if current_time - self.state["cpu_high_since"] >= alert_seconds:
                     if self.should_send_alert("cpu", current_time):
-                        self.send_webhook_alert("cpu", cpu_usage, hostname, ip_address, ec2_info)
+                        pending_alerts.append({"alert_type": "cpu", "current_value": cpu_usage})
         else:
             if self.state["cpu_high_since"]:
                 print(f"CPU usage returned to normal: {cpu_usage:.1f}%")
                 # Send recovery alert if we previously sent an alert
                 if self.should_send_recovery_alert("cpu", current_time):
-                    self.send_recovery_alert("cpu", cpu_usage, hostname, ip_address, ec2_info)
+                    self.send_recovery_alert("cpu", cpu_usage, hostname, ip_address, ec2_info, sent_at=current_time)
             self.state["cpu_high_since"] = None
         
         # Check Memory
-        memory_usage = self.get_memory_usage()
-        if memory_usage >= self.config["memory_threshold"]:
+        if memory_usage >= mem_thresh:
             if not self.state["memory_high_since"]:
-                self.state["memory_high_since"] = current_time.isoformat()
+                self.state["memory_high_since"] = current_time
                 print(f"Memory usage high: {memory_usage:.1f}% - starting timer")
             else:
-                high_since = datetime.fromisoformat(self.state["memory_high_since"])
-                if current_time - high_since >= alert_duration:
+                if current_time - self.state["memory_high_since"] >= alert_seconds:
                     if self.should_send_alert("memory", current_time):
-                        self.send_webhook_alert("memory", memory_usage, hostname, ip_address, ec2_info)
+                        pending_alerts.append({"alert_type": "memory", "current_value": memory_usage})
         else:
             if self.state["memory_high_since"]:
                 print(f"Memory usage returned to normal: {memory_usage:.1f}%")
                 # Send recovery alert if we previously sent an alert
                 if self.should_send_recovery_alert("memory", current_time):
-                    self.send_recovery_alert("memory", memory_usage, hostname, ip_address, ec2_info)
+                    self.send_recovery_alert("memory", memory_usage, hostname, ip_address, ec2_info, sent_at=current_time)
             self.state["memory_high_since"] = None
         
         # Check Disk partitions
-        for partition in self.config["disk_partitions"]:
+        for partition in self._disk_partitions:
             disk_usage = self.get_disk_usage(partition)
-            partition_key = partition.replace("/", "_root" if partition == "/" else "")
+            alert_key = disk_alert_keys[partition]
             
-            if disk_usage >= self.config["disk_threshold"]:
+            if disk_usage >= disk_thresh:
                 if partition not in self.state["disk_high_since"]:
-                    self.state["disk_high_since"][partition] = current_time.isoformat()
+                    self.state["disk_high_since"][partition] = current_time
                     print(f"Disk usage high on {partition}: {disk_usage:.1f}% - starting timer")
                 else:
-                    high_since = datetime.fromisoformat(self.state["disk_high_since"][partition])
-                    if current_time - high_since >= alert_duration:
-                        alert_key = f"disk_{partition_key}"
+                    if current_time - self.state["disk_high_since"][partition] >= alert_seconds:
                         if self.should_send_alert(alert_key, current_time):
-                            self.send_webhook_alert("disk", disk_usage, hostname, ip_address, ec2_info, partition)
+                            pending_alerts.append({"alert_type": "disk", "current_value": disk_usage, "partition": partition})
             else:
                 if partition in self.state["disk_high_since"]:
                     print(f"Disk usage returned to normal on {partition}: {disk_usage:.1f}%")
                     # Send recovery alert if we previously sent an alert
-                    alert_key = f"disk_{partition_key}"
                     if self.should_send_recovery_alert(alert_key, current_time):
-                        self.send_recovery_alert("disk", disk_usage, hostname, ip_address, ec2_info, partition)
+                        self.send_recovery_alert("disk", disk_usage, hostname, ip_address, ec2_info, partition, sent_at=current_time)
                     del self.state["disk_high_since"][partition]
         
+        if pending_alerts:
+            self.send_webhook_batch(pending_alerts, hostname, ip_address, ec2_info, sent_at=current_time)
+        
         # Save state after checks
         self.save_state()
     
     def run_once(self):
         """Run a single check cycle"""
+        # One timestamp for the whole cycle
+        now = time.time()
+        
         # Rotate log if needed (check once per day)
-        if not hasattr(self, '_last_log_check') or (datetime.now() - self._last_log_check).days >= 1:
+        if not hasattr(self, '_last_log_check') or now - self._last_log_check >= 24 * 3600:
             self.rotate_log_if_needed()
-            self._last_log_check = datetime.now()
+            self._last_log_check = now
         
-        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Running system check...")
+        # Take one reading for this cycle; display and threshold checks share it
+        snapshot = self._sample_snapshot()
         
-        # Display current usage
-        cpu_usage = self.get_cpu_usage()
-        memory_usage = self.get_memory_usage()
-        
-        print(f"CPU: {cpu_usage:.1f}% | Memory: {memory_usage:.1f}%", end="")
-        
-        for partition in self.config["disk_partitions"]:
-            disk_usage = self.get_disk_usage(partition)
-            print(f" | Disk {partition}: {disk_usage:.1f}%", end="")
-        
-        print()  # New line
+        # Display current usage as a single log line
+        if logger.isEnabledFor(logging.INFO):
+            disks = "".join(f" | Disk {partition}: {usage:.1f}%" for partition, usage in snapshot["disk"].items())
+            logger.info("CPU: %.1f%% | Memory: %.1f%%%s", snapshot["cpu"], snapshot["memory"], disks)
         
         # Check thresholds
-        self.check_thresholds()
+        self.check_thresholds(now)
+    
+    def reload_config(self):
+        """Reload the config file, keeping the current config if the new one is missing or invalid"""
+        print("Reloading configuration...")
+        old_config = self.config
+        try:
+            self.config = self._read_config()
+            self._apply_config()
+            self._prune_disk_timers()
+        except Exception as e:
+            print(f"Config reload rejected, keeping current configuration: {e}")
+            self.config = old_config
+            self._apply_config()
+            return False
+        return True
     
     def run_daemon(self):
         """Run as daemon with continuous monitoring"""
@@ -717,12 +982,27 @@ class SystemMonitor:
         print(f"Check interval: {self.config['check_interval_seconds']} seconds")
         print("Press Ctrl+C to stop")
         
-        try:
-            while True:
-                self.run_once()
-                time.sleep(self.config["check_interval_seconds"])
-        except KeyboardInterrupt:
-            print("\nStopping monitor...")
+        # SIGTERM/SIGINT wake the wait below immediately; SIGHUP reloads the config before the next check
+        self._shutdown = threading.Event()
+        self._reload_requested = False
+        
+        def request_reload(signum, frame):
+            self._reload_requested = True
+        
+        signal.signal(signal.SIGTERM, lambda signum, frame: self._shutdown.set())
+        signal.signal(signal.SIGINT, lambda signum, frame: self._shutdown.set())
+        signal.signal(signal.SIGHUP, request_reload)
+        
+        while True:
+            if self._reload_requested:
+                self._reload_requested = False
+                self.reload_config()
+            
+            self.run_once()
+            if self._shutdown.wait(self.config["check_interval_seconds"]):
+                break
+        
+        print("\nStopping monitor...")
 
 
 def main():
@@ -731,9 +1011,18 @@ def main():
     parser.add_argument("--once", action="store_true", help="Run once and exit (for cron)")
     parser.add_argument("--daemon", action="store_true", help="Run as daemon")
     parser.add_argument("--test-webhook", action="store_true", help="Send test webhook")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="Verbosity of the per-check usage line (WARNING hides it)")
     
     args = parser.parse_args()
     
+    logging.basicConfig(
+        stream=sys.stdout,
+        level=args.log_level,
+        format="[%(asctime)s] %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S"
+    )
+    
     monitor = SystemMonitor(args.config)
     
     if args.test_webhook: